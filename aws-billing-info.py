@@ -1,36 +1,52 @@
 #!/usr/bin/env python3
 
-import boto3
+import functools
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from tabulate import tabulate
 
+from aws_cache import cached_response
+from aws_sessions import PROFILE_CLIENT_CONFIG, prepare_sessions, profile_session
+
+MAX_WORKERS = 32
+
+@functools.lru_cache(maxsize=None)
+def _ce_client(profile):
+    """Return a cached Cost Explorer client for the given profile."""
+    return profile_session(profile).client('ce', config=PROFILE_CLIENT_CONFIG)
+
 def get_billing_info(profile):
     """Retrieve billing information for a given AWS profile."""
     try:
-        session = boto3.Session(profile_name=profile)
-        ce = session.client('ce')
+        # One client per profile, shared by the usage and forecast calls
+        ce = _ce_client(profile)
 
-        # Get the current date and first day of the month
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        first_day_of_month = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-        end_of_month = (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        # Get the current date and month boundaries once
+        today = datetime.now().date()
+        first_day_of_month = today.replace(day=1)
+        end_of_month = (first_day_of_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        current_date = today.isoformat()
 
         # Get cost for the current month
-        cost_response = ce.get_cost_and_usage(
-            TimePeriod={'Start': first_day_of_month, 'End': current_date},
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost']
-        )
-        month_to_date_cost = float(cost_response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
+        month_to_date_cost = float(cached_response(
+            ('get_cost_and_usage', profile, first_day_of_month.isoformat(), current_date, 'MONTHLY'),
+            lambda: ce.get_cost_and_usage(
+                TimePeriod={'Start': first_day_of_month.isoformat(), 'End': current_date},
+                Granularity='MONTHLY',
+                Metrics=['UnblendedCost']
+            )['ResultsByTime'][0]['Total']['UnblendedCost']['Amount']
+        ))
 
         # Get forecast for the rest of the month
-        forecast_response = ce.get_cost_forecast(
-            TimePeriod={'Start': current_date, 'End': end_of_month.strftime('%Y-%m-%d')},
-            Metric='UNBLENDED_COST',
-            Granularity='MONTHLY'
-        )
-        forecast = float(forecast_response['Total']['Amount'])
+        forecast = float(cached_response(
+            ('get_cost_forecast', profile, current_date, end_of_month.isoformat(), 'MONTHLY'),
+            lambda: ce.get_cost_forecast(
+                TimePeriod={'Start': current_date, 'End': end_of_month.isoformat()},
+                Metric='UNBLENDED_COST',
+                Granularity='MONTHLY'
+            )['Total']['Amount']
+        ))
 
         return {
             'Profile': profile,
@@ -45,11 +61,13 @@ def get_billing_info(profile):
 def main(profiles):
     """Retrieve and display billing information for given profiles."""
     billing_data = []
-    
-    for profile in profiles:
-        billing_info = get_billing_info(profile)
-        billing_data.append(billing_info)
-    
+    if profiles:
+        prepare_sessions(profiles, 'ce')
+
+        # Fetch profiles concurrently; map() keeps the output in argument order
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(profiles))) as executor:
+            billing_data = list(executor.map(get_billing_info, profiles))
+
     # Display the billing data in tabular format
     if billing_data:
         print(tabulate(billing_data, headers="keys", tablefmt="grid"))
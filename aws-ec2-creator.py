@@ -5,47 +5,68 @@ import botocore
 import os
 import sys
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+
+from aws_cache import CACHE_DIR, read_json, write_json
+
+try:
+    import questionary
+except ImportError:
+    questionary = None
+
+REGION_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
 
 def get_aws_profiles():
     session = boto3.Session()
     return session.available_profiles
 
-def select_aws_profile():
-    profiles = get_aws_profiles()
-    print("Available AWS profiles:")
-    for idx, profile in enumerate(profiles, start=1):
-        print(f"{idx}. {profile}")
+def select_from_list(heading, noun, choices):
+    # Prefix-search completion when questionary is installed
+    if questionary is not None:
+        answer = questionary.autocomplete(
+            f"Select a {noun}:",
+            choices=choices,
+            validate=lambda text: text in choices or f"Unknown {noun}: {text}"
+        ).ask()
+        if answer is None:
+            sys.exit(1)
+        return answer
+
+    # Otherwise fall back to a numbered menu
+    print(heading)
+    for idx, item in enumerate(choices, start=1):
+        print(f"{idx}. {item}")
     
     while True:
         try:
-            choice = int(input("\nSelect a profile by number: "))
-            if 1 <= choice <= len(profiles):
-                return profiles[choice - 1]
+            choice = int(input(f"\nSelect a {noun} by number: "))
+            if 1 <= choice <= len(choices):
+                return choices[choice - 1]
             else:
                 print("Invalid selection. Please try again.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
+def select_aws_profile():
+    profiles = get_aws_profiles()
+    return select_from_list("Available AWS profiles:", "profile", profiles)
+
 def get_aws_regions(session):
+    # Regions rarely change, so reuse a list fetched within the last week.
+    # The cache is per profile since opt-in regions differ between accounts.
+    cache_path = os.path.join(CACHE_DIR, f"regions-{session.profile_name}.json")
+    regions = read_json(cache_path, max_age=REGION_CACHE_TTL)
+    if regions is not None:
+        return regions
+
     ec2 = session.client('ec2')
     regions = [region['RegionName'] for region in ec2.describe_regions()['Regions']]
+    write_json(cache_path, regions)
     return regions
 
 def select_aws_region(session):
     regions = get_aws_regions(session)
-    print("\nAvailable AWS regions:")
-    for idx, region in enumerate(regions, start=1):
-        print(f"{idx}. {region}")
-    
-    while True:
-        try:
-            choice = int(input("\nSelect a region by number: "))
-            if 1 <= choice <= len(regions):
-                return regions[choice - 1]
-            else:
-                print("Invalid selection. Please try again.")
-        except ValueError:
-            print("Invalid input. Please enter a number.")
+    return select_from_list("\nAvailable AWS regions:", "region", regions)
 
 def create_security_group(ec2_client, vpc_id):
     while True:
@@ -54,6 +75,33 @@ def create_security_group(ec2_client, vpc_id):
         if not description:
             description = f"Security group for {group_name}"
 
+        # Validate inbound (ingress) ports before making any API calls
+        while True:
+            ingress_ports = input("Enter the inbound (ingress) ports to open (comma-separated, press Enter for default 22): ").strip()
+            if not ingress_ports:
+                ingress_ports = "22"
+
+            ports = [port.strip() for port in ingress_ports.split(',')]
+            invalid_ports = [port for port in ports if not (port.isdecimal() and 0 < int(port) <= 65535)]
+            for port in invalid_ports:
+                print(f"Invalid port number: {port}. Skipping.")
+
+            # Deduplicate while keeping the order the ports were entered in
+            valid_ports = list(dict.fromkeys(int(port) for port in ports if port not in invalid_ports))
+            if valid_ports:
+                break
+            print("No valid ports entered. Please try again.")
+
+        ip_permissions = [
+            {
+                'IpProtocol': 'tcp',
+                'FromPort': port,
+                'ToPort': port,
+                'IpRanges': [{'CidrIp': '0.0.0.0/0'}]
+            }
+            for port in valid_ports
+        ]
+
         try:
             response = ec2_client.create_security_group(
                 GroupName=group_name,
@@ -63,36 +111,12 @@ def create_security_group(ec2_client, vpc_id):
             security_group_id = response['GroupId']
             print(f"Security Group created: {security_group_id}")
 
-            # Add inbound rules
-            while True:
-                ingress_ports = input("Enter the inbound (ingress) ports to open (comma-separated, press Enter for default 22): ").strip()
-                if not ingress_ports:
-                    ingress_ports = "22"
-                
-                ports = [port.strip() for port in ingress_ports.split(',')]
-                ip_permissions = []
-                
-                for port in ports:
-                    try:
-                        port = int(port)
-                        ip_permissions.append({
-                            'IpProtocol': 'tcp',
-                            'FromPort': port,
-                            'ToPort': port,
-                            'IpRanges': [{'CidrIp': '0.0.0.0/0'}]
-                        })
-                    except ValueError:
-                        print(f"Invalid port number: {port}. Skipping.")
-                
-                if ip_permissions:
-                    ec2_client.authorize_security_group_ingress(
-                        GroupId=security_group_id,
-                        IpPermissions=ip_permissions
-                    )
-                    print(f"Inbound rules added for ports: {', '.join(str(p['FromPort']) for p in ip_permissions)}")
-                    break
-                else:
-                    print("No valid ports entered. Please try again.")
+            # Add inbound rules in a single request
+            ec2_client.authorize_security_group_ingress(
+                GroupId=security_group_id,
+                IpPermissions=ip_permissions
+            )
+            print(f"Inbound rules added for ports: {', '.join(str(port) for port in valid_ports)}")
 
             # Add outbound rule
             egress_port = input("Enter the outbound (egress) port to open (press Enter for all traffic): ").strip()
@@ -120,40 +144,45 @@ def create_security_group(ec2_client, vpc_id):
             if retry != 'y':
                 sys.exit(1)
 def manage_key_pair(ec2_client):
-    use_existing = input("Do you want to use an existing key pair? (y/n): ").lower().strip()
+    # Fetch existing key pairs while the user answers the prompt
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        key_pairs_future = executor.submit(ec2_client.describe_key_pairs)
+        use_existing = input("Do you want to use an existing key pair? (y/n): ").lower().strip()
     
     if use_existing == 'y':
-        key_pairs = ec2_client.describe_key_pairs()['KeyPairs']
-        print("\nAvailable key pairs:")
-        for idx, key in enumerate(key_pairs, start=1):
-            print(f"{idx}. {key['KeyName']}")
+        key_names = [key['KeyName'] for key in key_pairs_future.result()['KeyPairs']]
+        if key_names:
+            return select_from_list("\nAvailable key pairs:", "key pair", key_names)
+        print("No existing key pairs found in this region. Creating a new one.")
+
+    key_name = input("Enter a name for the new key pair: ")
+    try:
+        response = ec2_client.create_key_pair(KeyName=key_name)
+        private_key = response['KeyMaterial']
         
-        while True:
-            try:
-                choice = int(input("\nSelect a key pair by number: "))
-                if 1 <= choice <= len(key_pairs):
-                    return key_pairs[choice - 1]['KeyName']
-                else:
-                    print("Invalid selection. Please try again.")
-            except ValueError:
-                print("Invalid input. Please enter a number.")
-    else:
-        key_name = input("Enter a name for the new key pair: ")
-        try:
-            response = ec2_client.create_key_pair(KeyName=key_name)
-            private_key = response['KeyMaterial']
-            
-            # Save private key to file
-            key_file = f"{key_name}.pem"
-            with open(key_file, 'w') as f:
-                f.write(private_key)
-            os.chmod(key_file, 0o400)
-            
-            print(f"New key pair '{key_name}' created and saved to {key_file}")
-            return key_name
-        except ClientError as e:
-            print(f"Error creating key pair: {e}")
-            sys.exit(1)
+        # Save private key to file
+        key_file = f"{key_name}.pem"
+        with open(key_file, 'w') as f:
+            f.write(private_key)
+        os.chmod(key_file, 0o400)
+        
+        print(f"New key pair '{key_name}' created and saved to {key_file}")
+        return key_name
+    except ClientError as e:
+        print(f"Error creating key pair: {e}")
+        sys.exit(1)
+
+def get_latest_ami_id(ec2_client):
+    # Get the latest Amazon Linux 2 AMI
+    images = ec2_client.describe_images(
+        Owners=['amazon'],
+        Filters=[
+            {'Name': 'name', 'Values': ['amzn2-ami-hvm-*-x86_64-gp2']},
+            {'Name': 'architecture', 'Values': ['x86_64']},
+            {'Name': 'state', 'Values': ['available']}
+        ]
+    )
+    return max(images['Images'], key=lambda x: x['CreationDate'])['ImageId']
 
 def create_ec2_instance(ec2_resource, image_id, instance_type, key_name, security_group_id):
     try:
@@ -184,6 +213,12 @@ def main():
     ec2_client = session.client('ec2', region_name=region)
     ec2_resource = session.resource('ec2', region_name=region)
 
+    # Look up the AMI in the background while the user answers the prompts below;
+    # shutting down without waiting still lets the queued lookup finish
+    executor = ThreadPoolExecutor(max_workers=1)
+    ami_future = executor.submit(get_latest_ami_id, ec2_client)
+    executor.shutdown(wait=False)
+
     # Get default VPC
     default_vpc = list(ec2_resource.vpcs.filter(Filters=[{'Name': 'isDefault', 'Values': ['true']}]))[0]
     vpc_id = default_vpc.id
@@ -196,15 +231,7 @@ def main():
     if not instance_type:
         instance_type = 't2.micro'
 
-    # Get the latest Amazon Linux 2 AMI
-    images = ec2_client.describe_images(
-        Owners=['amazon'],
-        Filters=[
-            {'Name': 'name', 'Values': ['amzn2-ami-hvm-*-x86_64-gp2']},
-            {'Name': 'state', 'Values': ['available']}
-        ]
-    )
-    image_id = sorted(images['Images'], key=lambda x: x['CreationDate'], reverse=True)[0]['ImageId']
+    image_id = ami_future.result()
 
     instance = create_ec2_instance(ec2_resource, image_id, instance_type, key_name, security_group_id)
     
@@ -1,49 +1,57 @@
 #!/usr/bin/env python3
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 
+from aws_sessions import PROFILE_CLIENT_CONFIG, prepare_sessions, profile_session
+
+MAX_WORKERS = 16
+
 # Function to list AWS profiles
 def get_all_profiles():
     session = boto3.Session()
     return session.available_profiles
 
+# Cached EC2 client per profile and region
+@functools.lru_cache(maxsize=None)
+def _ec2_client(profile, region=None):
+    return profile_session(profile).client('ec2', region_name=region, config=PROFILE_CLIENT_CONFIG)
+
 # Function to get EC2 instances for a given profile
 def list_ec2_instances(profile):
     try:
-        session = boto3.Session(profile_name=profile)
-        ec2 = session.client('ec2')
+        ec2 = _ec2_client(profile)
         
-        # Describe instances
-        response = ec2.describe_instances()
+        # Describe instances, following pagination for large accounts
+        pages = ec2.get_paginator('describe_instances').paginate(PaginationConfig={'PageSize': 1000})
         
         # Extract useful information
         instances = []
-        for reservation in response['Reservations']:
-            for instance in reservation['Instances']:
-                instance_id = instance['InstanceId']
-                state = instance['State']['Name']
-                instance_type = instance['InstanceType']
-                public_ip = instance.get('PublicIpAddress', 'None')
-                private_ip = instance.get('PrivateIpAddress', 'None')
-                name = 'None'
-                
-                # Get instance name from tags if exists
-                if 'Tags' in instance:
-                    for tag in instance['Tags']:
-                        if tag['Key'] == 'Name':
-                            name = tag['Value']
-                
-                instances.append({
-                    'Instance ID': instance_id,
-                    'Name': name,
-                    'State': state,
-                    'Type': instance_type,
-                    'Private IP': private_ip,
-                    'Public IP': public_ip,
-                    'Launch Time': instance['LaunchTime']
-                })
+        for page in pages:
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    instance_id = instance['InstanceId']
+                    state = instance['State']['Name']
+                    instance_type = instance['InstanceType']
+                    public_ip = instance.get('PublicIpAddress', 'None')
+                    private_ip = instance.get('PrivateIpAddress', 'None')
+                    
+                    # Get instance name from tags if exists
+                    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                    name = tags.get('Name', 'None')
+                    
+                    instances.append({
+                        'Instance ID': instance_id,
+                        'Name': name,
+                        'State': state,
+                        'Type': instance_type,
+                        'Private IP': private_ip,
+                        'Public IP': public_ip,
+                        'Launch Time': instance['LaunchTime']
+                    })
         
         return instances
     except ClientError as e:
@@ -53,8 +61,7 @@ def list_ec2_instances(profile):
 # Function to stop an EC2 instance
 def stop_instance(profile, instance_id):
     try:
-        session = boto3.Session(profile_name=profile)
-        ec2 = session.client('ec2')
+        ec2 = _ec2_client(profile)
         ec2.stop_instances(InstanceIds=[instance_id])
         print(f"Stopping instance {instance_id}...")
     except ClientError as e:
@@ -63,8 +70,7 @@ def stop_instance(profile, instance_id):
 # Function to start an EC2 instance
 def start_instance(profile, instance_id):
     try:
-        session = boto3.Session(profile_name=profile)
-        ec2 = session.client('ec2')
+        ec2 = _ec2_client(profile)
         ec2.start_instances(InstanceIds=[instance_id])
         print(f"Starting instance {instance_id}...")
     except ClientError as e:
@@ -73,8 +79,7 @@ def start_instance(profile, instance_id):
 # Function to reboot an EC2 instance
 def reboot_instance(profile, instance_id):
     try:
-        session = boto3.Session(profile_name=profile)
-        ec2 = session.client('ec2')
+        ec2 = _ec2_client(profile)
         ec2.reboot_instances(InstanceIds=[instance_id])
         print(f"Rebooting instance {instance_id}...")
     except ClientError as e:
@@ -83,8 +88,7 @@ def reboot_instance(profile, instance_id):
 # Function to terminate an EC2 instance
 def terminate_instance(profile, instance_id):
     try:
-        session = boto3.Session(profile_name=profile)
-        ec2 = session.client('ec2')
+        ec2 = _ec2_client(profile)
         ec2.terminate_instances(InstanceIds=[instance_id])
         print(f"Terminating instance {instance_id}...")
     except ClientError as e:
@@ -92,8 +96,10 @@ def terminate_instance(profile, instance_id):
 
 # Main function to display instances and manage them
 def manage_instances(profile):
-    instances = list_ec2_instances(profile)
-    
+    interact_with_instances(profile, list_ec2_instances(profile))
+
+# Function to display already-fetched instances and prompt for actions
+def interact_with_instances(profile, instances):
     if not instances:
         print(f"No instances found for profile {profile}.")
         return
@@ -131,9 +137,18 @@ def manage_instances(profile):
 # Function to handle 'all' profiles option
 def manage_all_profiles():
     profiles = get_all_profiles()
+    if not profiles:
+        return
+
+    prepare_sessions(profiles, 'ec2')
+
+    # Fetch every profile's instances concurrently, then prompt one profile at a time
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(profiles))) as executor:
+        results = dict(zip(profiles, executor.map(list_ec2_instances, profiles)))
+
     for profile in profiles:
         print(f"\nManaging instances for profile: {profile}")
-        manage_instances(profile)
+        interact_with_instances(profile, results[profile])
 
 if __name__ == "__main__":
     profiles = get_all_profiles()
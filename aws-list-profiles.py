@@ -1,58 +1,109 @@
 #!/usr/bin/env python3
 
-import configparser
+import functools
 import os
-import boto3
+import re
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 
+from aws_sessions import PROFILE_CLIENT_CONFIG, prepare_sessions, profile_session
+
+MAX_WORKERS = 32
+
+@functools.lru_cache(maxsize=None)
+def _sts_client(profile):
+    """Return a cached STS client for the given profile."""
+    return profile_session(profile).client('sts', config=PROFILE_CLIENT_CONFIG)
+
 def get_account_id(profile):
     """Retrieve AWS Account ID for a given profile."""
     try:
-        session = boto3.Session(profile_name=profile)
-        sts = session.client('sts')
+        sts = _sts_client(profile)
         return sts.get_caller_identity()["Account"]
     except ClientError as e:
         return f"Error: {str(e)}"
 
+# configparser's section header pattern; the name is kept as written
+SECTION_HEADER = re.compile(r"\[(?P<header>.+)\]")
+
+def read_aws_ini(path, keys=("region", "aws_access_key_id")):
+    """Scan an AWS ini file for section headers and the given keys only."""
+    sections = {}
+    section = None
+    in_value = False
+    try:
+        with open(path) as f:
+            for raw_line in f:
+                line = raw_line.strip()
+                if not line or line.startswith(("#", ";")):
+                    continue
+                # Indented lines after a key continue its value (e.g. nested
+                # "s3 =" blocks), so their keys must not be read as the profile's
+                if in_value and raw_line[0].isspace():
+                    continue
+                in_value = False
+                header = SECTION_HEADER.match(line)
+                if header:
+                    section = header.group("header")
+                    sections.setdefault(section, {})
+                elif section is not None:
+                    # Like configparser, split on whichever of "=" or ":" comes first
+                    separators = [i for i in (line.find("="), line.find(":")) if i != -1]
+                    if not separators:
+                        continue
+                    in_value = True
+                    key, value = line[:min(separators)], line[min(separators) + 1:]
+                    key = key.strip().lower()
+                    if key in keys:
+                        sections[section][key] = value.strip()
+    except OSError:
+        pass
+
+    # As with configparser, DEFAULT is not a section of its own; its keys
+    # are fallbacks for every other section
+    defaults = sections.pop("DEFAULT", {})
+    return {name: {**defaults, **values} for name, values in sections.items()}
+
 def get_aws_profiles():
     """Retrieve all AWS profiles from the config and credentials files."""
-    config = configparser.ConfigParser()
-    credentials = configparser.ConfigParser()
-    
     # Read AWS config and credentials files
-    config.read(os.path.expanduser("~/.aws/config"))
-    credentials.read(os.path.expanduser("~/.aws/credentials"))
+    config = read_aws_ini(os.path.expanduser("~/.aws/config"))
+    credentials = read_aws_ini(os.path.expanduser("~/.aws/credentials"))
     
-    profiles = []
+    profiles_by_name = {}
     
     # Process profiles from config file
-    for section in config.sections():
+    for section in config:
         if section.startswith("profile "):
             profile_name = section[8:]  # Remove "profile " prefix
             region = config[section].get("region", "Not set")
-            account_id = get_account_id(profile_name)
-            profiles.append({
+            profiles_by_name[profile_name] = {
                 "Profile": profile_name,
-                "Region": region,
-                "Account ID": account_id
-            })
+                "Region": region
+            }
     
-    # Add or update profiles from credentials file
-    for profile in credentials.sections():
-        existing = next((p for p in profiles if p["Profile"] == profile), None)
+    # Add profiles that only appear in the credentials file
+    for profile in credentials:
+        existing = profiles_by_name.get(profile)
         if not existing:
             region = "Not set"
             if profile in config:
                 region = config[profile].get("region", "Not set")
-            account_id = get_account_id(profile)
-            profiles.append({
+            profiles_by_name[profile] = {
                 "Profile": profile,
-                "Region": region,
-                "Account ID": account_id
-            })
-    
-    return profiles
+                "Region": region
+            }
+
+    # Look up account IDs concurrently; each lookup is a blocking STS call
+    if profiles_by_name:
+        names = list(profiles_by_name)
+        prepare_sessions(names, 'sts')
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(names))) as executor:
+            for name, account_id in zip(names, executor.map(get_account_id, names)):
+                profiles_by_name[name]["Account ID"] = account_id
+
+    return list(profiles_by_name.values())
 
 def main():
     profiles = get_aws_profiles()
@@ -3,41 +3,63 @@
 import boto3
 from botocore.exceptions import ClientError
 import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from tabulate import tabulate
 import calendar
 
-def get_cost_and_usage(ce_client, start_date, end_date, granularity='MONTHLY'):
+from aws_cache import cached_response
+from aws_sessions import shared_client_config
+
+MAX_WORKERS = 3
+
+def get_cost_and_usage(ce_client, profile, start_date, end_date, granularity='MONTHLY'):
     """Retrieve cost and usage data for the specified date range."""
     try:
-        response = ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start_date,
-                'End': end_date
-            },
-            Granularity=granularity,
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-            ]
+        def fetch():
+            # Daily results grouped by service are paginated for long ranges
+            request = {
+                'TimePeriod': {
+                    'Start': start_date,
+                    'End': end_date
+                },
+                'Granularity': granularity,
+                'Metrics': ['UnblendedCost'],
+                'GroupBy': [
+                    {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+                ]
+            }
+            results = []
+            while True:
+                response = ce_client.get_cost_and_usage(**request)
+                results.extend(response['ResultsByTime'])
+                if 'NextPageToken' not in response:
+                    return results
+                request['NextPageToken'] = response['NextPageToken']
+
+        return cached_response(
+            ('get_cost_and_usage', profile, start_date, end_date, granularity, 'SERVICE'),
+            fetch
         )
-        return response['ResultsByTime']
     except ClientError as e:
         print(f"Error retrieving cost data: {str(e)}")
         return None
 
-def get_cost_forecast(ce_client, start_date, end_date):
+def get_cost_forecast(ce_client, profile, start_date, end_date):
     """Retrieve cost forecast for the specified date range."""
     try:
-        response = ce_client.get_cost_forecast(
-            TimePeriod={
-                'Start': start_date,
-                'End': end_date
-            },
-            Metric='UNBLENDED_COST',
-            Granularity='MONTHLY'
+        return cached_response(
+            ('get_cost_forecast', profile, start_date, end_date, 'MONTHLY'),
+            lambda: ce_client.get_cost_forecast(
+                TimePeriod={
+                    'Start': start_date,
+                    'End': end_date
+                },
+                Metric='UNBLENDED_COST',
+                Granularity='MONTHLY'
+            )['Total']['Amount']
         )
-        return response['Total']['Amount']
     except ClientError as e:
         print(f"Error retrieving cost forecast: {str(e)}")
         return None
@@ -45,33 +67,76 @@ def get_cost_forecast(ce_client, start_date, end_date):
 def format_cost(cost):
     """Format cost as a string with two decimal places."""
     return f"${float(cost):.2f}"
+
+def group_daily_costs(results):
+    """Index daily cost results as {day: {service: cost}}."""
+    daily_costs = {}
+    for result in results:
+        day_costs = daily_costs.setdefault(result['TimePeriod']['Start'], Counter())
+        for group in result['Groups']:
+            day_costs[group['Keys'][0]] += float(group['Metrics']['UnblendedCost']['Amount'])
+    return daily_costs
+
+def service_costs(daily_costs, start_date, end_date):
+    """Total cost per service for days in [start_date, end_date)."""
+    start, end = start_date.isoformat(), end_date.isoformat()
+    services = Counter()
+    for day, day_costs in daily_costs.items():
+        if start <= day < end:
+            services.update(day_costs)
+    return services
+
+def period_cost(daily_totals, start_date, end_date):
+    """Total cost across all services for days in [start_date, end_date)."""
+    start, end = start_date.isoformat(), end_date.isoformat()
+    return sum(total for day, total in daily_totals.items() if start <= day < end)
 def analyze_costs(profile, days):
     """Analyze and display comprehensive cost data for the specified profile."""
     session = boto3.Session(profile_name=profile)
-    ce_client = session.client('ce')
+    # One client is shared by all the query threads, so size its pool to match
+    ce_client = session.client('ce', config=shared_client_config(MAX_WORKERS))
 
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days)
 
     print(f"Analyzing costs for profile '{profile}' from {start_date} to {end_date}")
 
-    # Current period analysis
-    results = get_cost_and_usage(ce_client, start_date.isoformat(), end_date.isoformat())
+    # Compute every date range up front; all but the previous window are
+    # sliced from one daily query
+    first_day_current_month = end_date.replace(day=1)
+    first_day_prev_month = (first_day_current_month - timedelta(days=1)).replace(day=1)
+    last_day_current_month = end_date.replace(day=calendar.monthrange(end_date.year, end_date.month)[1])
+    first_day_of_year = end_date.replace(month=1, day=1)
+    prev_period_start = start_date - timedelta(days=days)
+    query_start = min(start_date, first_day_prev_month, first_day_of_year)
+
+    # One daily query covers the current window, months and year to date;
+    # the forecast and previous window run alongside it
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        usage_future = executor.submit(get_cost_and_usage, ce_client, profile, query_start.isoformat(), end_date.isoformat(), 'DAILY')
+        forecast_future = executor.submit(get_cost_forecast, ce_client, profile, (end_date + timedelta(days=1)).isoformat(), last_day_current_month.isoformat())
+        # The previous window can reach past Cost Explorer's lookback, so it is
+        # fetched on its own and a failure only drops the trend line
+        prev_period_future = None
+        if days >= 60:
+            prev_period_future = executor.submit(get_cost_and_usage, ce_client, profile, prev_period_start.isoformat(), start_date.isoformat())
+        results = usage_future.result()
+        forecast = forecast_future.result()
+        prev_period_results = prev_period_future.result() if prev_period_future else None
+
     if not results:
         return
+    daily_costs = group_daily_costs(results)
+    # Collapse each day to a single total once; the period sums below then
+    # scan one float per day rather than every service of every day
+    daily_totals = {day: sum(day_costs.values()) for day, day_costs in daily_costs.items()}
 
-    total_cost = 0
-    services = {}
-
-    for result in results:
-        for group in result['Groups']:
-            service = group['Keys'][0]
-            cost = float(group['Metrics']['UnblendedCost']['Amount'])
-            total_cost += cost
-            services[service] = services.get(service, 0) + cost
+    # Current period analysis
+    services = service_costs(daily_costs, start_date, end_date)
+    total_cost = sum(services.values())
 
-    # Sort services by cost (descending)
-    sorted_services = sorted(services.items(), key=lambda x: x[1], reverse=True)
+    # Services by cost (descending)
+    sorted_services = services.most_common()
 
     # Prepare data for tabulate
     table_data = [
@@ -96,42 +161,31 @@ def analyze_costs(profile, days):
     print(f"5. Daily average cost: {format_cost(daily_avg)}")
 
     # Previous month's cost
-    first_day_prev_month = (end_date.replace(day=1) - timedelta(days=1)).replace(day=1)
-    last_day_prev_month = end_date.replace(day=1) - timedelta(days=1)
-    prev_month_results = get_cost_and_usage(ce_client, first_day_prev_month.isoformat(), last_day_prev_month.isoformat())
-    if prev_month_results:
-        prev_month_cost = sum(float(result['Groups'][0]['Metrics']['UnblendedCost']['Amount']) if result['Groups'] else 0 for result in prev_month_results)
-        print(f"6. Previous month's total cost: {format_cost(prev_month_cost)}")
+    prev_month_cost = period_cost(daily_totals, first_day_prev_month, first_day_current_month)
+    print(f"6. Previous month's total cost: {format_cost(prev_month_cost)}")
 
     # Current month-to-date cost
-    first_day_current_month = end_date.replace(day=1)
-    current_month_results = get_cost_and_usage(ce_client, first_day_current_month.isoformat(), end_date.isoformat())
-    if current_month_results:
-        current_month_cost = sum(float(result['Groups'][0]['Metrics']['UnblendedCost']['Amount']) if result['Groups'] else 0 for result in current_month_results)
-        print(f"7. Current month-to-date cost: {format_cost(current_month_cost)}")
+    current_month_cost = period_cost(daily_totals, first_day_current_month, end_date)
+    print(f"7. Current month-to-date cost: {format_cost(current_month_cost)}")
 
     # Forecast for the rest of the month
-    last_day_current_month = end_date.replace(day=calendar.monthrange(end_date.year, end_date.month)[1])
-    forecast = get_cost_forecast(ce_client, (end_date + timedelta(days=1)).isoformat(), last_day_current_month.isoformat())
     if forecast:
         total_forecast = current_month_cost + float(forecast)
         print(f"8. Forecasted cost for this month: {format_cost(total_forecast)}")
 
     # Year-to-date cost
-    first_day_of_year = end_date.replace(month=1, day=1)
-    ytd_results = get_cost_and_usage(ce_client, first_day_of_year.isoformat(), end_date.isoformat())
-    if ytd_results:
-        ytd_cost = sum(float(result['Groups'][0]['Metrics']['UnblendedCost']['Amount']) if result['Groups'] else 0 for result in ytd_results)
-        print(f"9. Year-to-date cost: {format_cost(ytd_cost)}")
+    ytd_cost = period_cost(daily_totals, first_day_of_year, end_date)
+    print(f"9. Year-to-date cost: {format_cost(ytd_cost)}")
 
     # Cost trend (comparing with previous period)
-    if days >= 60:
-        prev_period_start = start_date - timedelta(days=days)
-        prev_period_results = get_cost_and_usage(ce_client, prev_period_start.isoformat(), start_date.isoformat())
-        if prev_period_results:
-            prev_period_cost = sum(float(result['Groups'][0]['Metrics']['UnblendedCost']['Amount']) if result['Groups'] else 0 for result in prev_period_results)
-            cost_change = ((total_cost - prev_period_cost) / prev_period_cost) * 100 if prev_period_cost > 0 else 0
-            print(f"10. Cost trend: {'Increase' if cost_change > 0 else 'Decrease'} of {abs(cost_change):.2f}% compared to previous {days} days")
+    if prev_period_results:
+        prev_period_cost = sum(
+            float(group['Metrics']['UnblendedCost']['Amount'])
+            for result in prev_period_results
+            for group in result['Groups']
+        )
+        cost_change = ((total_cost - prev_period_cost) / prev_period_cost) * 100 if prev_period_cost > 0 else 0
+        print(f"10. Cost trend: {'Increase' if cost_change > 0 else 'Decrease'} of {abs(cost_change):.2f}% compared to previous {days} days")
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze AWS service costs for a profile.")
@@ -0,0 +1,72 @@
+"""On-disk JSON cache shared by the aws-*.py scripts."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import date
+
+CACHE_DIR = os.path.expanduser('~/.cache/aws-cli-helper')
+COST_EXPLORER_CACHE_DIR = os.path.join(CACHE_DIR, 'cost-explorer')
+
+def read_json(path, max_age=None):
+    """Return the JSON stored at path, or None if it is missing or stale.
+
+    With max_age (seconds) an entry is fresh for that long; without it an
+    entry is fresh only on the day it was written.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+        if max_age is None:
+            if date.fromtimestamp(mtime) != date.today():
+                return None
+        elif time.time() - mtime >= max_age:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_json(path, data):
+    """Atomically write data as JSON to path, ignoring filesystem errors."""
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def prune_before_today(directory):
+    """Delete cache files in directory that were last written before today."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    today = date.today()
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if date.fromtimestamp(os.path.getmtime(path)) < today:
+                os.remove(path)
+        except OSError:
+            pass
+
+def cached_response(key, fetch):
+    """Return fetch() for the given key, reusing a result stored on disk today.
+
+    Cost Explorer charges per request and its figures only refresh a few
+    times a day, so results are cached on disk and expire at midnight.
+    """
+    path = os.path.join(COST_EXPLORER_CACHE_DIR, hashlib.sha256(json.dumps(key).encode()).hexdigest() + '.json')
+    result = read_json(path)
+    if result is not None:
+        return result
+
+    result = fetch()
+    prune_before_today(COST_EXPLORER_CACHE_DIR)
+    write_json(path, result)
+    return result
@@ -0,0 +1,54 @@
+"""Per-profile boto3 sessions that share one botocore data loader."""
+
+import functools
+import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError
+from botocore.loaders import create_loader
+
+# Adaptive retries back off client-side when Cost Explorer or EC2 throttle
+RETRIES = {'mode': 'adaptive', 'max_attempts': 10}
+
+# A per-profile client is only used by the one worker thread handling that
+# profile, so it never needs more than a few connections
+PROFILE_CLIENT_CONFIG = Config(max_pool_connections=4, retries=RETRIES)
+
+def shared_client_config(workers):
+    """Return a client config whose pool fits a client shared by that many threads."""
+    return Config(max_pool_connections=workers, retries=RETRIES)
+
+# Every profile's session shares one data loader, so each service model
+# is parsed once per run instead of once per Session
+_LOADER = create_loader()
+
+def _core_session():
+    """Return a new botocore session that uses the shared data loader."""
+    core_session = botocore.session.get_session()
+    core_session.register_component('data_loader', _LOADER)
+    return core_session
+
+@functools.lru_cache(maxsize=None)
+def profile_session(profile):
+    """Return a cached boto3 Session for the given profile."""
+    return boto3.Session(profile_name=profile, botocore_session=_core_session())
+
+def prepare_sessions(profiles, service):
+    """Create the profiles' sessions and load a service's models up front.
+
+    Call this on the main thread before starting worker threads, so that
+    workers only reuse cached sessions and already-parsed models.
+    """
+    for profile in profiles:
+        profile_session(profile)
+
+    try:
+        # Dummy keys skip the credential chain; the client is never used
+        _core_session().create_client(
+            service,
+            region_name='us-east-1',
+            aws_access_key_id='warmup',
+            aws_secret_access_key='warmup'
+        )
+    except BotoCoreError:
+        pass